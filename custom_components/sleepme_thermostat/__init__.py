@@ -1,20 +1,63 @@
 import logging
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
-from .sleepme import SleepMeClient
+from .hub import HUBS, async_get_hub, async_release_device
+from .profiler import ProfilerBusyError, async_profile
+from .tracing import async_export_traces
+from .transport import RecordingBusyError, async_record
 from .update_manager import SleepMeUpdateManager
-from .const import DOMAIN
+from .const import CONF_SHARED_BUDGET_PATH, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["climate", "binary_sensor", "sensor"]
+
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
+SERVICE_PROFILE = "profile"
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("seconds", default=60): vol.All(vol.Coerce(float), vol.Range(min=1, max=300)),
+})
+
+SERVICE_RECORD = "record"
+RECORD_SCHEMA = vol.Schema({
+    vol.Optional("seconds", default=3600): vol.All(vol.Coerce(float), vol.Range(min=1, max=43200)),
+})
+
+SERVICE_EXPORT_TRACES = "export_traces"
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the SleepMe Thermostat component."""
     _LOGGER.debug("Starting async_setup for SleepMe Thermostat.")
     hass.data.setdefault(DOMAIN, {})
+
+    async def async_handle_profile(call: ServiceCall):
+        """Profile the integration for the requested number of seconds."""
+        apis = {hub.key: hub.api for hub in hass.data[DOMAIN].get(HUBS, {}).values()}
+        try:
+            await async_profile(hass, apis, call.data["seconds"])
+        except ProfilerBusyError as err:
+            raise HomeAssistantError(str(err)) from err
+
+    async def async_handle_record(call: ServiceCall):
+        """Capture the API traffic of every account for the requested number of seconds."""
+        apis = {hub.key: hub.api for hub in hass.data[DOMAIN].get(HUBS, {}).values()}
+        try:
+            await async_record(hass, apis, call.data["seconds"])
+        except RecordingBusyError as err:
+            raise HomeAssistantError(str(err)) from err
+
+    async def async_handle_export_traces(call: ServiceCall):
+        """Write the recently sampled request traces to the config directory."""
+        await async_export_traces(hass)
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RECORD, async_handle_record, schema=RECORD_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_EXPORT_TRACES, async_handle_export_traces)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -42,24 +85,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("API token or device ID is missing from configuration.")
         return False
 
-    sleepme_controller = SleepMeClient(hass, api_url, api_token, device_id)
-    hass.data[DOMAIN]["sleepme_controller"] = sleepme_controller
+    # Devices of the same account share one hub, and with it one request budget
+    hub = async_get_hub(hass, api_url, api_token)
+    await hub.async_setup()
+    client = hub.add_device(device_id)
+    hub.use_shared_budget(device_id, entry.options.get(CONF_SHARED_BUDGET_PATH))
 
-    update_manager = SleepMeUpdateManager(hass, api_url, api_token, device_id)
+    update_manager = SleepMeUpdateManager(hass, client, entry)
     hass.data[DOMAIN][f"{device_id}_update_manager"] = update_manager
 
-    await update_manager.async_config_entry_first_refresh()
-
-    hass.data[DOMAIN]["device_info"] = {
-        "firmware_version": firmware_version,
-        "mac_address": mac_address,
-        "model": model,
-        "serial_number": serial_number,
-    }
+    try:
+        await update_manager.async_config_entry_first_refresh()
+    except Exception:
+        async_release_device(hass, api_token, device_id)
+        hass.data[DOMAIN].pop(f"{device_id}_update_manager", None)
+        raise
 
     _LOGGER.debug(f"SleepMeClient and Update Manager initialized and stored in hass.data for device {device_id}.")
 
-    await hass.config_entries.async_forward_entry_setups(entry, ["climate", "binary_sensor", "sensor"])
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     _LOGGER.info("SleepMe Thermostat component initialized successfully.")
-    return True
\ No newline at end of file
+    return True
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload a SleepMe Thermostat config entry."""
+    device_id = entry.data.get("device_id")
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+    if unload_ok:
+        hass.data[DOMAIN].pop(f"{device_id}_update_manager", None)
+        hass.data[DOMAIN].pop(device_id, None)
+        async_release_device(hass, entry.data.get("api_token"), device_id)
+        _LOGGER.debug(f"[Device {device_id}] Config entry unloaded.")
+
+    return unload_ok
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    """Apply a changed shared budget option without reloading the entry.
+
+    The listener also runs when the update manager writes a new firmware
+    version to the entry's data, which must not restart the device.
+    """
+    hub = async_get_hub(hass, entry.data.get("api_url"), entry.data.get("api_token"))
+    hub.use_shared_budget(entry.data.get("device_id"), entry.options.get(CONF_SHARED_BUDGET_PATH))
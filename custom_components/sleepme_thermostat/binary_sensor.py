@@ -1,11 +1,39 @@
 import logging
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from dataclasses import dataclass
+from functools import partial
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
+from .entity import SleepMeDescribedEntity, SleepMeEntityDescriptionMixin, describe
 
 _LOGGER = logging.getLogger(__name__)
 
+@dataclass(frozen=True, kw_only=True)
+class SleepMeBinarySensorEntityDescription(BinarySensorEntityDescription, SleepMeEntityDescriptionMixin):
+    """Describes a SleepMe binary sensor and how to read it from the coordinator data."""
+
+_describe = partial(describe, SleepMeBinarySensorEntityDescription)
+
+BINARY_SENSOR_DESCRIPTIONS = (
+    _describe(
+        "status", "is_water_low",
+        key="water_low",
+        name="Water Level",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+    ),
+    _describe(
+        "status", "is_connected",
+        key="connected",
+        name="Connected",
+        device_class=BinarySensorDeviceClass.CONNECTIVITY,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+)
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up SleepMe Thermostat binary sensors from a config entry."""
     device_id = entry.data.get("device_id")
@@ -24,47 +52,18 @@ async def async_setup_entry(hass, entry, async_add_entities):
         )
         return
 
-    # Create the sensors and add them
-    water_level_sensor = WaterLevelLowSensor(coordinator, thermostat, device_id, name)
-    connected_sensor = DeviceConnectedBinarySensor(coordinator, thermostat, device_id, name)
-
-    async_add_entities([water_level_sensor, connected_sensor])
-
-class WaterLevelLowSensor(CoordinatorEntity, BinarySensorEntity):
-    """Representation of a binary sensor that indicates if the water level is low."""
-
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} Water Level"
-        self._attr_device_class = "problem"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_water_low"
-
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
-
-    @property
-    def is_on(self):
-        """Return true if the water level is low."""
-        return self.coordinator.data["status"].get("is_water_low")
-
-class DeviceConnectedBinarySensor(CoordinatorEntity, BinarySensorEntity):
-    """Representation of a binary sensor that indicates if the device is connected."""
+    # One generic entity per described field
+    async_add_entities(
+        SleepMeBinarySensor(coordinator, thermostat, device_id, name, description)
+        for description in BINARY_SENSOR_DESCRIPTIONS
+    )
 
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} Connected"
-        self._attr_device_class = "connectivity"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_connected"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+class SleepMeBinarySensor(SleepMeDescribedEntity, BinarySensorEntity):
+    """Representation of a SleepMe binary sensor defined by an entity description."""
 
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
+    entity_description: SleepMeBinarySensorEntityDescription
 
     @property
     def is_on(self):
-        """Return true if the device is connected."""
-        return self.coordinator.data["status"].get("is_connected")
+        """Return the value of the described field."""
+        return self._value()
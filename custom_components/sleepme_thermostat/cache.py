@@ -0,0 +1,41 @@
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds cached data is trusted before a lookup that needs it goes back to the API
+CLAIMED_DEVICES_TTL = 300
+DEVICE_INFO_TTL = 24 * 3600
+NETWORK_INFO_TTL = 3600
+
+# "about" fields grouped by how often they are expected to change
+ABOUT_FIELD_GROUPS = {
+    "device_info": (("firmware_version", "mac_address", "model", "serial_number"), DEVICE_INFO_TTL),
+    "network_info": (("ip_address", "lan_address"), NETWORK_INFO_TTL),
+}
+
+class TTLCache:
+    """Small key/value cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._entries = {}
+
+    def get(self, key, default=None):
+        """Return the cached value, or ``default`` if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires = entry
+        if self.clock() >= expires:
+            del self._entries[key]
+            return default
+        return value
+
+    def set(self, key, value, ttl: float):
+        """Cache ``value`` for ``ttl`` seconds."""
+        self._entries[key] = (value, self.clock() + ttl)
+
+    def invalidate(self, key):
+        """Drop a cached value so the next read goes to the API."""
+        self._entries.pop(key, None)
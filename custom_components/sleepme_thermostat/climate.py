@@ -1,6 +1,4 @@
-import asyncio
 import logging
-from typing import Any, Awaitable, Callable
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
@@ -10,14 +8,12 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .command_actor import SleepMeCommandActor
 from .const import DOMAIN, PRESET_MAX_COOL, PRESET_MAX_HEAT, PRESET_TEMPERATURES
+from .tracing import tracer
 
 _LOGGER = logging.getLogger(__name__)
 
-RETRY_ATTEMPTS = 3
-POST_COMMAND_DELAY = 10
-RETRY_DELAY = 127
-
 def round_half_up(n):
     """Round a number to the nearest .0 or .5."""
     return round(n * 2) / 2
@@ -35,6 +31,9 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities([thermostat])
 
 class SleepMeThermostat(CoordinatorEntity, ClimateEntity):
+    # Mirrored by the binary sensors, so keep them out of the recorder's attribute history
+    _unrecorded_attributes = frozenset({"is_water_low", "is_connected"})
+
     def __init__(self, coordinator, device_id, name, device_info):
         super().__init__(coordinator)
         self._name = f"Dock Pro {name}"
@@ -51,57 +50,15 @@ class SleepMeThermostat(CoordinatorEntity, ClimateEntity):
             "connections": {("mac", device_info.get("mac_address"))},
             "serial_number": device_info.get("serial_number"),
         }
-    
-    async def _async_api_command_with_retry(
-        self,
-        command_callable: Callable[[], Awaitable[Any]],
-        verification_callable: Callable[[], bool],
-        command_description: str,
-    ) -> bool:
-        """
-        Execute an API command with a retry mechanism to handle rate limiting.
-        Returns True on success, False on failure.
-        """
-        for attempt in range(RETRY_ATTEMPTS):
-            _LOGGER.debug(
-                "Executing command '%s', attempt %d of %d",
-                command_description, attempt + 1, RETRY_ATTEMPTS
-            )
-            try:
-                await command_callable()
-            except Exception as e:
-                _LOGGER.warning(
-                    "API command '%s' failed on attempt %d: %s",
-                    command_description, attempt + 1, e
-                )
-                if attempt < RETRY_ATTEMPTS - 1:
-                    await asyncio.sleep(RETRY_DELAY)
-                continue
-
-            await asyncio.sleep(POST_COMMAND_DELAY)
-
-            await self.coordinator.async_request_refresh()
-
-            if verification_callable():
-                _LOGGER.info(
-                    "Command '%s' successfully verified after attempt %d.",
-                    command_description, attempt + 1
-                )
-                self.async_write_ha_state()
-                return True
-
-            _LOGGER.warning(
-                "Verification for '%s' failed on attempt %d. State not updated.",
-                command_description, attempt + 1
-            )
-            if attempt < RETRY_ATTEMPTS - 1:
-                await asyncio.sleep(RETRY_DELAY)
 
-        _LOGGER.error(
-            "Failed to execute and verify command '%s' after %d attempts.",
-            command_description, RETRY_ATTEMPTS
-        )
-        return False
+        # Commands to this device go through a single actor, so a newer setpoint
+        # cancels the pending retries of an older one instead of racing it.
+        self._command_actor = SleepMeCommandActor(coordinator.hass, coordinator, self.async_write_ha_state)
+
+    async def async_will_remove_from_hass(self):
+        """Stop sending commands once the entity is removed."""
+        await super().async_will_remove_from_hass()
+        await self._command_actor.async_stop()
 
     @property
     def min_temp(self):
@@ -184,11 +141,14 @@ class SleepMeThermostat(CoordinatorEntity, ClimateEntity):
         command_func = lambda: self.coordinator.client.set_temp_level(target_temp)
         verification = lambda: self.coordinator.data["control"].get("set_temperature_c") == round_half_up(target_temp)
 
-        await self._async_api_command_with_retry(
-            command_callable=command_func,
-            verification_callable=verification,
-            command_description=f"Set temperature to {target_temp}C"
-        )
+        with tracer.start_trace("climate.set_temperature", device_id=self._device_id, temperature=target_temp) as span:
+            verified = await self._command_actor.submit(
+                "set_temperature_c",
+                command_callable=command_func,
+                verification_callable=verification,
+                command_description=f"Set temperature to {target_temp}C"
+            )
+            span.set(verified=verified)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
@@ -200,27 +160,32 @@ class SleepMeThermostat(CoordinatorEntity, ClimateEntity):
         command_func = lambda: self.coordinator.client.set_device_status(target_status)
         verification = lambda: self.coordinator.data["control"].get("thermal_control_status") == target_status
 
-        await self._async_api_command_with_retry(
-            command_callable=command_func,
-            verification_callable=verification,
-            command_description=f"Set HVAC mode to {hvac_mode}"
-        )
+        with tracer.start_trace("climate.set_hvac_mode", device_id=self._device_id, hvac_mode=hvac_mode) as span:
+            verified = await self._command_actor.submit(
+                "thermal_control_status",
+                command_callable=command_func,
+                verification_callable=verification,
+                command_description=f"Set HVAC mode to {hvac_mode}"
+            )
+            span.set(verified=verified)
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new preset mode."""
-        if self.hvac_mode == HVACMode.OFF and preset_mode != PRESET_NONE:
-            await self.async_set_hvac_mode(HVACMode.AUTO)
-
-        if preset_mode in PRESET_TEMPERATURES:
-            if self.target_temperature is not None:
-                self._previous_target_temperature = self.target_temperature
-            await self.async_set_temperature(temperature=PRESET_TEMPERATURES[preset_mode])
-        elif preset_mode == PRESET_NONE:
-            if self.target_temperature is None:
-                if self._previous_target_temperature is not None:
-                    await self.async_set_temperature(temperature=self._previous_target_temperature)
-                else:
-                    await self.async_set_temperature(temperature=self.current_temperature)
+        # The HVAC mode and temperature commands below join this trace as child spans
+        with tracer.start_trace("climate.set_preset_mode", device_id=self._device_id, preset_mode=preset_mode):
+            if self.hvac_mode == HVACMode.OFF and preset_mode != PRESET_NONE:
+                await self.async_set_hvac_mode(HVACMode.AUTO)
+
+            if preset_mode in PRESET_TEMPERATURES:
+                if self.target_temperature is not None:
+                    self._previous_target_temperature = self.target_temperature
+                await self.async_set_temperature(temperature=PRESET_TEMPERATURES[preset_mode])
+            elif preset_mode == PRESET_NONE:
+                if self.target_temperature is None:
+                    if self._previous_target_temperature is not None:
+                        await self.async_set_temperature(temperature=self._previous_target_temperature)
+                    else:
+                        await self.async_set_temperature(temperature=self.current_temperature)
 
     def _sanitize_temperature(self, temp):
         """Sanitize temperature values returned by the API."""
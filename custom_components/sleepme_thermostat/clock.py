@@ -0,0 +1,57 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event loop iterations given to runnable tasks before virtual time moves on
+SETTLE_PASSES = 20
+
+class VirtualClock:
+    """Monotonic clock and sleeper that advance virtual time instead of waiting.
+
+    Pass ``clock.monotonic`` and ``clock.sleep`` to ``SleepMeAPI`` (or
+    ``SleepMeClient``) to run rate limiting, backoff and command verification
+    delays without real waits. Sleepers are woken in deadline order, so several
+    concurrent tasks still observe a consistent timeline. Before each jump the
+    clock yields SETTLE_PASSES loop iterations so tasks that are runnable at
+    the current instant get there first; it works on any asyncio loop.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._sleepers = []
+        self._counter = itertools.count()
+        self._advancer = None
+
+    def monotonic(self) -> float:
+        """Return the current virtual time in seconds."""
+        return self._now
+
+    async def sleep(self, delay: float, result=None):
+        """Suspend the caller until virtual time has advanced by ``delay`` seconds."""
+        loop = asyncio.get_running_loop()
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return result
+
+        future = loop.create_future()
+        heapq.heappush(self._sleepers, (self._now + delay, next(self._counter), future))
+        if self._advancer is None or self._advancer.done():
+            self._advancer = loop.create_task(self._advance())
+        await future
+        return result
+
+    async def _advance(self):
+        """Wake sleepers one deadline at a time once the runnable tasks have settled."""
+        while self._sleepers:
+            for _ in range(SETTLE_PASSES):
+                await asyncio.sleep(0)
+
+            deadline, _, future = heapq.heappop(self._sleepers)
+            if future.cancelled():
+                continue
+            self._now = max(self._now, deadline)
+            future.set_result(None)
+            _LOGGER.debug("Virtual clock advanced to %.3f seconds.", self._now)
@@ -0,0 +1,167 @@
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from .tracing import tracer
+
+_LOGGER = logging.getLogger(__name__)
+
+RETRY_ATTEMPTS = 3
+POST_COMMAND_DELAY = 10
+RETRY_DELAY = 127
+
+class _Intent:
+    """A desired device state together with how to send and verify it."""
+
+    def __init__(self, command_callable, verification_callable, command_description, future):
+        self.command_callable = command_callable
+        self.verification_callable = verification_callable
+        self.command_description = command_description
+        self.future = future
+        # Run the command in the submitter's context so its trace continues in the worker
+        self.context = contextvars.copy_context()
+
+class SleepMeCommandActor:
+    """Serializes the commands sent to one device.
+
+    Commands run one at a time, in submission order. Each command has a key
+    naming the setting it changes (e.g. the set temperature); submitting a new
+    intent for a key drops a queued intent for the same key and cancels one
+    that is already sending, retrying or waiting for verification, so only the
+    latest desired state is sent and verified. Superseded intents resolve to
+    False.
+    """
+
+    def __init__(self, hass, coordinator, on_verified: Callable[[], None] = None):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.on_verified = on_verified
+        self._pending = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._current_key = None
+        self._current_intent = None
+        self._current_task = None
+
+    async def submit(
+        self,
+        key: str,
+        command_callable: Callable[[], Awaitable[Any]],
+        verification_callable: Callable[[], bool],
+        command_description: str,
+    ) -> bool:
+        """Queue an intent and wait until it is verified, fails or is superseded."""
+        intent = _Intent(command_callable, verification_callable, command_description, asyncio.get_running_loop().create_future())
+
+        superseded = self._pending.pop(key, None)
+        if superseded is not None:
+            _LOGGER.debug("Command '%s' superseded by '%s' before it was sent.", superseded.command_description, command_description)
+            superseded.future.set_result(False)
+
+        if self._current_key == key and self._current_task is not None and not self._current_task.done():
+            _LOGGER.debug("Cancelling in-flight command for '%s' in favour of '%s'.", key, command_description)
+            self._current_task.cancel()
+
+        self._pending[key] = intent
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            name = f"SleepMe command actor {self.coordinator.device_id}"
+            if self.hass is not None:
+                self._worker = self.hass.async_create_background_task(self._run(), name)
+            else:
+                # Offline runs, e.g. replaying a capture, have no Home Assistant instance
+                self._worker = asyncio.create_task(self._run(), name=name)
+
+        return await asyncio.shield(intent.future)
+
+    async def _run(self):
+        """Execute queued intents one at a time."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending:
+                key, intent = self._pending.popitem(last=False)
+                self._current_key, self._current_intent = key, intent
+                self._current_task = asyncio.create_task(self._execute(intent), context=intent.context)
+                try:
+                    # wait() does not propagate the task's cancellation to this worker
+                    await asyncio.wait({self._current_task})
+                finally:
+                    task = self._current_task
+                    self._current_key, self._current_intent, self._current_task = None, None, None
+
+                if intent.future.done():
+                    continue
+                if task.cancelled():
+                    _LOGGER.debug("Command '%s' was superseded while in flight.", intent.command_description)
+                    intent.future.set_result(False)
+                elif task.exception() is not None:
+                    intent.future.set_exception(task.exception())
+                else:
+                    intent.future.set_result(task.result())
+
+    async def _execute(self, intent: _Intent) -> bool:
+        """Send a command and verify it, retrying to ride out rate limiting."""
+        sleep = self.coordinator.client.api.sleep
+        for attempt in range(RETRY_ATTEMPTS):
+            _LOGGER.debug(
+                "Executing command '%s', attempt %d of %d",
+                intent.command_description, attempt + 1, RETRY_ATTEMPTS
+            )
+            try:
+                with tracer.span("command", attempt=attempt + 1):
+                    await intent.command_callable()
+            except Exception as e:
+                _LOGGER.warning(
+                    "API command '%s' failed on attempt %d: %s",
+                    intent.command_description, attempt + 1, e
+                )
+                if attempt < RETRY_ATTEMPTS - 1:
+                    with tracer.span("retry_delay", seconds=RETRY_DELAY):
+                        await sleep(RETRY_DELAY)
+                continue
+
+            with tracer.span("post_command_delay", seconds=POST_COMMAND_DELAY):
+                await sleep(POST_COMMAND_DELAY)
+
+            with tracer.span("verification_refresh") as span:
+                await self.coordinator.async_request_traced_refresh(span)
+
+            if intent.verification_callable():
+                _LOGGER.info(
+                    "Command '%s' successfully verified after attempt %d.",
+                    intent.command_description, attempt + 1
+                )
+                if self.on_verified is not None:
+                    self.on_verified()
+                return True
+
+            _LOGGER.warning(
+                "Verification for '%s' failed on attempt %d. State not updated.",
+                intent.command_description, attempt + 1
+            )
+            if attempt < RETRY_ATTEMPTS - 1:
+                with tracer.span("retry_delay", seconds=RETRY_DELAY):
+                    await sleep(RETRY_DELAY)
+
+        _LOGGER.error(
+            "Failed to execute and verify command '%s' after %d attempts.",
+            intent.command_description, RETRY_ATTEMPTS
+        )
+        return False
+
+    async def async_stop(self):
+        """Cancel the current command and drop everything still queued."""
+        for intent in (*self._pending.values(), self._current_intent):
+            if intent is not None and not intent.future.done():
+                intent.future.set_result(False)
+        self._pending.clear()
+
+        for task in (self._current_task, self._worker):
+            if task is not None and not task.done():
+                task.cancel()
+        if self._worker is not None:
+            await asyncio.wait({self._worker})
+        self._worker = None
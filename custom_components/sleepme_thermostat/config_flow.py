@@ -1,9 +1,12 @@
 import logging
+import sqlite3
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from .sleepme import SleepMeClient
-from .const import DOMAIN, API_URL
+from .hub import async_get_hub, async_release_hub
+from .shared_budget import SQLiteSharedBudget
+from .const import DOMAIN, API_URL, CONF_SHARED_BUDGET_PATH
 from httpx import HTTPStatusError
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,6 +21,12 @@ class SleepMeThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.api_token = ""
         self.claimed_devices = []
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow for this handler."""
+        return SleepMeThermostatOptionsFlow(config_entry)
+
     @staticmethod
     def _schema(api_token: str = "") -> vol.Schema:
         """Return the schema for the current step."""
@@ -31,12 +40,17 @@ class SleepMeThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             _LOGGER.debug(f"User input received: {user_input}")
+            # Don't keep a hub around for a token the user has replaced
+            if self.api_token and self.api_token != user_input.get("api_token"):
+                async_release_hub(self.hass, self.api_token)
             self.api_token = user_input.get("api_token")
 
-            client = SleepMeClient(self.hass, API_URL, self.api_token)
+            # Reuse the account's hub so listings are cached and requests share its budget
+            client = async_get_hub(self.hass, API_URL, self.api_token).transient_client()
 
             try:
-                self.claimed_devices = await client.get_claimed_devices()
+                # Wait for the rate limit rather than have the listing discarded while devices are polling
+                self.claimed_devices = await client.get_claimed_devices(wait=True)
                 _LOGGER.debug(f"Claimed devices: {self.claimed_devices}")
 
                 if not self.claimed_devices:
@@ -77,11 +91,14 @@ class SleepMeThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(device_id)
             self._abort_if_unique_id_configured()
 
-            client = SleepMeClient(self.hass, API_URL, self.api_token, device_id)
+            client = async_get_hub(self.hass, API_URL, self.api_token).transient_client(device_id)
 
             try:
-                device_status = await client.get_device_status()
-                _LOGGER.debug(f"Device status: {device_status}")
+                about = await client.get_device_about(wait=True)
+                _LOGGER.debug(f"Device metadata: {about}")
+
+                if not any(about.values()):
+                    raise ValueError("cannot_fetch_device_info")
 
                 return self.async_create_entry(
                     title=f"Dock Pro {name}",
@@ -90,10 +107,10 @@ class SleepMeThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         "api_token": self.api_token,
                         "device_id": device_id,
                         "name": name,
-                        "firmware_version": device_status.get("about", {}).get("firmware_version"),
-                        "mac_address": device_status.get("about", {}).get("mac_address"),
-                        "model": device_status.get("about", {}).get("model"),
-                        "serial_number": device_status.get("about", {}).get("serial_number"),
+                        "firmware_version": about.get("firmware_version"),
+                        "mac_address": about.get("mac_address"),
+                        "model": about.get("model"),
+                        "serial_number": about.get("serial_number"),
                     },
                 )
 
@@ -120,3 +137,54 @@ class SleepMeThermostatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_import(self, user_input=None) -> FlowResult:
         """Handle import from YAML."""
         return await self.async_step_user(user_input)
+
+    @callback
+    def async_remove(self) -> None:
+        """Drop the hub the flow created if no configured device ended up using it."""
+        if self.api_token:
+            async_release_hub(self.hass, self.api_token)
+
+class SleepMeThermostatOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for SleepMe Thermostat."""
+
+    def __init__(self, config_entry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Manage the shared rate budget option."""
+        errors = {}
+
+        if user_input is not None:
+            _LOGGER.debug(f"Options received: {user_input}")
+            path = user_input.get(CONF_SHARED_BUDGET_PATH, "").strip()
+            user_input = {**user_input, CONF_SHARED_BUDGET_PATH: path}
+
+            if path:
+                try:
+                    await self.hass.async_add_executor_job(SQLiteSharedBudget(path).validate)
+                except (sqlite3.Error, OSError) as err:
+                    _LOGGER.error(f"Shared rate budget file {path} is not usable: {err}")
+                    errors["base"] = "invalid_shared_budget_path"
+
+            if not errors:
+                self._apply_to_account(user_input)
+                return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_SHARED_BUDGET_PATH,
+                    default=(user_input or self._entry.options).get(CONF_SHARED_BUDGET_PATH, ""),
+                ): str,
+            }),
+            errors=errors,
+        )
+
+    def _apply_to_account(self, options: dict):
+        """The budget belongs to the account, so copy the option to its other devices' entries."""
+        token = self._entry.data.get("api_token")
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if entry.entry_id != self._entry.entry_id and entry.data.get("api_token") == token and entry.options != options:
+                self.hass.config_entries.async_update_entry(entry, options={**entry.options, **options})
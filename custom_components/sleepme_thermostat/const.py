@@ -8,6 +8,8 @@ API_URL = APP_API_URL  # Optional: Alias for APP_API_URL for consistency
 
 DOMAIN = "sleepme_thermostat"
 
+CONF_SHARED_BUDGET_PATH = "shared_budget_path"
+
 PRESET_MAX_COOL = 'Max Cool'
 PRESET_MAX_HEAT = 'Max Heat'
 
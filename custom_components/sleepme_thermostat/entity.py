@@ -0,0 +1,100 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_UNSET = object()
+
+def field_accessor(section: str, key: str, transform=None):
+    """Compile a value extractor for ``coordinator.data[section][key]``.
+
+    The section and key are bound once, so reading a value costs two dict
+    lookups and no per-call string handling.
+    """
+    if transform is None:
+        def _get(data, _section=section, _key=key):
+            return data[_section].get(_key)
+    else:
+        def _get(data, _section=section, _key=key, _transform=transform):
+            value = data[_section].get(_key)
+            return None if value is None else _transform(value)
+    return _get
+
+@dataclass(frozen=True, kw_only=True)
+class SleepMeEntityDescriptionMixin:
+    """Where a described entity reads its value in the coordinator data."""
+
+    field: tuple[str, str]
+    value_fn: Callable[[dict], Any]
+
+def describe(description_class, section: str, key: str, transform=None, **kwargs):
+    """Build a ``description_class`` reading ``coordinator.data[section][key]``."""
+    return description_class(
+        field=(section, key),
+        value_fn=field_accessor(section, key, transform),
+        **kwargs,
+    )
+
+class SleepMeCoordinatorEntity(CoordinatorEntity):
+    """Coordinator entity that skips state writes for polls that changed nothing it shows.
+
+    Home Assistant already drops identical states before they reach the
+    recorder; this only saves rendering the state and attributes on every poll.
+    """
+
+    # Fields (section, key) this entity reads; None means it reads anything
+    _change_keys = None
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._last_written_state = _UNSET
+
+    def _state_fingerprint(self):
+        """Return the value that decides whether a new state must be written.
+
+        Defaults to the entity's state; override when attributes matter too.
+        """
+        return self.state
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value or availability changed since the last poll."""
+        if (
+            self._change_keys is not None
+            and self._last_written_state is not _UNSET
+            and self._last_written_state[0] == self.available
+            and self._change_keys.isdisjoint(self.coordinator.changed_fields)
+        ):
+            # None of the fields this entity reads changed in this poll
+            return
+
+        fingerprint = (self.available, self._state_fingerprint())
+        if fingerprint == self._last_written_state:
+            return
+        self._last_written_state = fingerprint
+        super()._handle_coordinator_update()
+
+class SleepMeDescribedEntity(SleepMeCoordinatorEntity):
+    """Entity whose value and change keys come from its entity description."""
+
+    def __init__(self, coordinator, thermostat, device_id, name, description):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._thermostat = thermostat
+        self._device_id = device_id
+        self._attr_name = f"Dock Pro {name} {description.name}"
+        self._attr_unique_id = f"{DOMAIN}_{device_id}_{description.key}"
+        self._change_keys = frozenset({description.field})
+
+        # Reuse the device info from the thermostat entity
+        self._attr_device_info = thermostat.device_info
+
+    def _value(self):
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    def _state_fingerprint(self):
+        return self._value()
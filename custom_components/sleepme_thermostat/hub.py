@@ -0,0 +1,109 @@
+import logging
+from homeassistant.core import HomeAssistant
+from .cache import TTLCache
+from .const import DOMAIN
+from .shared_budget import SQLiteSharedBudget
+from .sleepme import SleepMeClient
+from .sleepme_api import SleepMeAPI, token_key
+
+_LOGGER = logging.getLogger(__name__)
+
+HUBS = "hubs"
+
+class SleepMeAccountHub:
+    """Account-level hub shared by every device configured with the same API token.
+
+    The hub owns the account's single SleepMeAPI, so all of its devices draw
+    from one rate limit budget that is split fairly between them, while other
+    accounts keep fully independent budgets.
+    """
+
+    def __init__(self, hass: HomeAssistant, api_url: str, token: str, client=None):
+        self.hass = hass
+        self.api_url = api_url
+        self.token = token
+        self.key = token_key(token)
+        self.api = SleepMeAPI(hass, api_url, token, client=client)
+        self.cache = TTLCache(self.api.clock)
+        self.clients = {}
+        # Shared budget file set on each device's config entry; the account uses one of them
+        self._shared_budget_paths = {}
+        self._loaded = False
+
+    async def async_setup(self):
+        """Restore the account's learned rate limit budget once."""
+        if not self._loaded:
+            self._loaded = True
+            await self.api.async_load_rate_limit()
+
+    def add_device(self, device_id: str) -> SleepMeClient:
+        """Register a device with the hub and return its client."""
+        client = self.clients.get(device_id)
+        if client is None:
+            client = SleepMeClient(self.hass, self.api_url, self.token, device_id, api=self.api, cache=self.cache)
+            self.clients[device_id] = client
+            self.api.device_ids.add(device_id)
+            _LOGGER.debug(f"[Account {self.key}] Added device {device_id}. Devices on this account: {len(self.clients)}")
+        return client
+
+    def use_shared_budget(self, device_id: str, path: str):
+        """Record a device's shared budget file and apply the account's setting."""
+        if path:
+            self._shared_budget_paths[device_id] = path
+        else:
+            self._shared_budget_paths.pop(device_id, None)
+        self._apply_shared_budget()
+
+    def _apply_shared_budget(self):
+        """Share the budget through the file the loaded devices set, or keep it local if none does."""
+        paths = sorted(set(self._shared_budget_paths.values()))
+        if len(paths) > 1:
+            _LOGGER.warning(f"[Account {self.key}] Devices on this account name different shared budget files {paths}. Using {paths[0]}.")
+        path = paths[0] if paths else None
+
+        if path is None:
+            if self.api.shared_budget is not None:
+                _LOGGER.debug(f"[Account {self.key}] Rate budget is no longer shared.")
+                self.api.shared_budget = None
+        elif self.api.shared_budget is None or self.api.shared_budget.path != path:
+            _LOGGER.debug(f"[Account {self.key}] Sharing the rate budget through {path}")
+            self.api.shared_budget = SQLiteSharedBudget(path)
+
+    def transient_client(self, device_id: str = None) -> SleepMeClient:
+        """Return a client sharing the account's budget and cache without registering a device."""
+        return SleepMeClient(self.hass, self.api_url, self.token, device_id, api=self.api, cache=self.cache)
+
+    def remove_device(self, device_id: str):
+        """Unregister a device so it no longer takes a share of the budget."""
+        self.clients.pop(device_id, None)
+        self.api.device_ids.discard(device_id)
+        if self._shared_budget_paths.pop(device_id, None) is not None:
+            self._apply_shared_budget()
+        _LOGGER.debug(f"[Account {self.key}] Removed device {device_id}. Devices on this account: {len(self.clients)}")
+
+def async_get_hub(hass: HomeAssistant, api_url: str, token: str) -> SleepMeAccountHub:
+    """Return the hub for a token, creating it on first use."""
+    hubs = hass.data.setdefault(DOMAIN, {}).setdefault(HUBS, {})
+    key = token_key(token)
+    hub = hubs.get(key)
+    if hub is None:
+        hub = SleepMeAccountHub(hass, api_url, token)
+        hubs[key] = hub
+    return hub
+
+def async_release_device(hass: HomeAssistant, token: str, device_id: str):
+    """Remove a device from its hub, dropping the hub once it has no devices left."""
+    hub = hass.data.get(DOMAIN, {}).get(HUBS, {}).get(token_key(token))
+    if hub is None:
+        return
+    hub.remove_device(device_id)
+    async_release_hub(hass, token)
+
+def async_release_hub(hass: HomeAssistant, token: str):
+    """Drop the hub for a token if no device uses it, e.g. one created by an abandoned config flow."""
+    hubs = hass.data.get(DOMAIN, {}).get(HUBS, {})
+    key = token_key(token)
+    hub = hubs.get(key)
+    if hub is not None and not hub.clients:
+        hubs.pop(key)
+        _LOGGER.debug(f"[Account {key}] No devices left. Hub removed.")
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+INTEGRATION_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILER_FILE = os.path.abspath(__file__)
+
+# Seconds between two stack samples of the event loop thread
+SAMPLE_INTERVAL = 0.005
+
+# Frames kept per traced allocation, so allocations made inside json, httpx or
+# logging are charged to the package line that called into them
+TRACEMALLOC_FRAMES = 25
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is already running."""
+
+class IntegrationProfiler:
+    """Samples the integration's own call paths on the event loop thread.
+
+    A background thread reads the event loop thread's stack every
+    ``interval`` seconds and charges the wall time, CPU time and memory
+    allocated since the previous sample to every function of this package on
+    that stack. Nothing runs on
+    the loop itself, so the cost does not grow with the number of calls.
+    Suspended coroutines are not on the stack, so the figures are what each
+    function spent running on the loop, not time awaiting the network or a
+    sleep.
+    """
+
+    _running = False
+
+    def __init__(self, apis, interval: float = SAMPLE_INTERVAL):
+        self._apis = apis
+        self.interval = interval
+        self._functions = {}
+        self._samples = 0
+        self._stats_before = {}
+        self._started = None
+        self._started_cpu = None
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._snapshot_before = None
+        self._tracemalloc_started = False
+        self._allocated = 0
+        self._peak = 0
+
+    def _sample(self):
+        cpu_clock = self._cpu_clock()
+        last_wall, last_cpu = time.perf_counter(), cpu_clock()
+        last_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        while not self._stop.wait(self.interval):
+            wall, cpu = time.perf_counter(), cpu_clock()
+            wall_delta, cpu_delta = wall - last_wall, cpu - last_cpu
+            last_wall, last_cpu = wall, cpu
+
+            # Growth up to the peak is memory allocated since the last sample, even if it was
+            # freed again; it is a lower bound, as memory freed and reused within the interval
+            # is only counted once
+            traced, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            allocated = max(0, peak - last_traced)
+            last_traced = traced
+            self._allocated += allocated
+            self._peak = max(self._peak, peak)
+
+            frame = sys._current_frames().get(self._thread_id)
+            self._samples += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename.startswith(INTEGRATION_DIR) and code.co_filename != PROFILER_FILE:
+                    key = (code.co_qualname, os.path.basename(code.co_filename), code.co_firstlineno)
+                    # Recursive frames are charged once per sample
+                    if key not in seen:
+                        seen.add(key)
+                        entry = self._functions.get(key)
+                        if entry is None:
+                            entry = self._functions[key] = [0, 0.0, 0.0, 0]
+                        entry[0] += 1
+                        entry[1] += wall_delta
+                        entry[2] += cpu_delta
+                        entry[3] += allocated
+                frame = frame.f_back
+
+    def _cpu_clock(self):
+        """Return a function reading the event loop thread's CPU time, or a zero clock where unsupported."""
+        try:
+            clock_id = time.pthread_getcpuclockid(self._thread_id)
+        except (AttributeError, OSError):
+            return lambda: 0.0
+        return lambda: time.clock_gettime(clock_id)
+
+    def start(self):
+        """Start sampling the current thread, which must be the event loop thread."""
+        if IntegrationProfiler._running:
+            raise ProfilerBusyError("A profile is already running.")
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._tracemalloc_started = True
+        try:
+            self._snapshot_before = self._snapshot()
+            self._stats_before = {name: dict(api.stats) for name, api in self._apis.items()}
+            self._started = time.perf_counter()
+            self._started_cpu = time.process_time()
+            self._thread_id = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, name="sleepme_profiler", daemon=True)
+            self._sampler.start()
+        except BaseException:
+            if self._tracemalloc_started:
+                tracemalloc.stop()
+            raise
+        IntegrationProfiler._running = True
+
+    def stop(self) -> str:
+        """Stop sampling and return the formatted report."""
+        self._stop.set()
+        self._sampler.join()
+        elapsed = time.perf_counter() - self._started
+        cpu = time.process_time() - self._started_cpu
+
+        try:
+            allocations = self._net_allocations(self._snapshot().compare_to(self._snapshot_before, "traceback"))
+        finally:
+            if self._tracemalloc_started:
+                tracemalloc.stop()
+            IntegrationProfiler._running = False
+
+        return self._format_report(elapsed, cpu, allocations)
+
+    @staticmethod
+    def _snapshot():
+        # Keep allocations with a package frame anywhere in their traceback, not just the innermost one
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, os.path.join(INTEGRATION_DIR, "*"), all_frames=True)]
+        )
+
+    @staticmethod
+    def _net_allocations(differences) -> list:
+        """Group traceback differences by the innermost package line that led to the allocation."""
+        by_line = {}
+        for difference in differences:
+            for frame in reversed(difference.traceback):
+                if frame.filename.startswith(INTEGRATION_DIR) and frame.filename != PROFILER_FILE:
+                    key = (os.path.basename(frame.filename), frame.lineno)
+                    break
+            else:
+                continue
+            entry = by_line.setdefault(key, [0, 0])
+            entry[0] += difference.count_diff
+            entry[1] += difference.size_diff
+        return sorted(by_line.items(), key=lambda item: abs(item[1][1]), reverse=True)
+
+    def _format_report(self, elapsed, cpu, allocations) -> str:
+        lines = [
+            f"SleepMe Thermostat profile - {datetime.now().isoformat(timespec='seconds')}",
+            f"Sampled {elapsed:.1f}s of wall time every {self.interval * 1000:.0f}ms ({self._samples} samples), "
+            f"{cpu:.3f}s of process CPU time.",
+            f"Memory allocated during the run (whole process, lower bound): {self._allocated / 1024:.1f} KiB, "
+            f"peak traced memory {self._peak / 1024:.1f} KiB.",
+            "",
+            "Time and allocations on the event loop per function (estimated from samples, cumulative, includes callees).",
+            "Alloc KiB is memory allocated while the function was on the stack, including",
+            "short-lived objects such as formatted log messages and parsed JSON:",
+            f"{'samples':>8} {'wall ms':>10} {'cpu ms':>10} {'alloc KiB':>10}  function",
+        ]
+        for (name, filename, lineno), (samples, wall, cpu_time, allocated) in sorted(
+            self._functions.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(f"{samples:>8} {wall * 1000:>10.2f} {cpu_time * 1000:>10.2f} {allocated / 1024:>10.1f}  {name} ({filename}:{lineno})")
+
+        lines += ["", "Time per request phase (includes time suspended on awaits):"]
+        for name, api in self._apis.items():
+            before = self._stats_before.get(name, {})
+            delta = {key: value - before.get(key, 0) for key, value in api.stats.items()}
+            lines.append(
+                f"  {name}: {delta['requests']} requests, {delta['discarded']} discarded, "
+                f"rate limiter wait {delta['rate_limit_wait']:.2f}s, network {delta['network']:.2f}s, "
+                f"retry backoff {delta['backoff']:.2f}s"
+            )
+
+        lines += [
+            "",
+            "Memory retained per package line, end of the run compared with its start.",
+            "Allocations made in json, httpx or logging are charged to the package line",
+            "that called them. These figures are net, so a line that keeps growing points",
+            "at retained data; short-lived objects show in the alloc KiB column above.",
+            f"{'blocks':>8} {'KiB':>10}  location",
+        ]
+        for (filename, lineno), (count, size) in allocations[:30]:
+            if count or size:
+                lines.append(f"{count:>+8} {size / 1024:>+10.1f}  {filename}:{lineno}")
+
+        return "\n".join(lines) + "\n"
+
+async def async_profile(hass, apis, seconds: float) -> str:
+    """Profile the integration for ``seconds`` and write the report to the config directory."""
+    profiler = IntegrationProfiler(apis)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        report = profiler.stop()
+
+    path = hass.config.path(f"sleepme_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+
+    def _write():
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(report)
+
+    await hass.async_add_executor_job(_write)
+    _LOGGER.info("SleepMe Thermostat profile written to %s", path)
+    return path
@@ -0,0 +1,173 @@
+import logging
+import math
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+LIMIT_HEADERS = ("x-ratelimit-limit", "ratelimit-limit")
+REMAINING_HEADERS = ("x-ratelimit-remaining", "ratelimit-remaining")
+RESET_HEADERS = ("x-ratelimit-reset", "ratelimit-reset")
+
+def _header_number(headers, names):
+    """Return the first numeric value found among the given header names."""
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            # Structured headers may carry extra parameters, e.g. "9;w=60"
+            return float(str(value).split(";")[0].split(",")[0].strip())
+        except ValueError:
+            _LOGGER.debug("Ignoring non-numeric %s header: %s", name, value)
+    return None
+
+def parse_retry_after(headers):
+    """Return the Retry-After delay in seconds, or None if absent or unparseable."""
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        _LOGGER.debug("Ignoring unparseable Retry-After header: %s", value)
+        return None
+
+class AdaptiveRateLimiter:
+    """Sliding-window request budget that learns the server's real limit.
+
+    Rate-limit headers are authoritative when the API sends them. Otherwise the
+    budget follows additive-increase/multiplicative-decrease: it is halved on
+    a 429, at most once per window so retries and concurrent requests hitting
+    the same limit count as one signal, and grows by one request for each full
+    window spent saturated without being throttled.
+    """
+
+    def __init__(self, max_requests: int = 9, interval: float = 60, clock=time.monotonic, min_requests: int = 1, max_requests_ceiling: int = 60):
+        self.interval = interval
+        self.clock = clock
+        self.min_requests = min_requests
+        self.max_requests_ceiling = max_requests_ceiling
+        self.limit = max_requests
+        self.header_limit = None
+        self.request_times = deque()
+        self._blocked_until = None
+        self._last_adjustment = clock()
+        self._last_decrease = None
+
+    @property
+    def max_requests(self) -> int:
+        """Return the number of requests currently allowed per window."""
+        return max(self.min_requests, int(self.limit))
+
+    def _prune(self, now: float):
+        while self.request_times and now - self.request_times[0][0] >= self.interval:
+            self.request_times.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Return how long to wait before the next request may be sent."""
+        self._prune(now)
+        wait = 0.0
+        if len(self.request_times) >= self.max_requests:
+            oldest, _ = self.request_times[len(self.request_times) - self.max_requests]
+            wait = self.interval - (now - oldest)
+        if self._blocked_until is not None:
+            wait = max(wait, self._blocked_until - now)
+        return max(0.0, wait)
+
+    def record_request(self, now: float, key=None):
+        """Count a request against the current window, attributed to ``key``."""
+        self.request_times.append((now, key))
+
+    def exceeds_fair_share(self, key, now: float, active_keys) -> bool:
+        """Return True if ``key`` should yield the remaining budget to other keys.
+
+        Each active key is entitled to an equal share of the window. A key that
+        has used its share may still borrow free slots, as long as enough remain
+        for every other key to reach its own share.
+        """
+        if key is None or len(active_keys) <= 1:
+            return False
+
+        self._prune(now)
+        used = {}
+        for _, request_key in self.request_times:
+            used[request_key] = used.get(request_key, 0) + 1
+
+        share = max(1, self.max_requests // len(active_keys))
+        if used.get(key, 0) < share:
+            return False
+
+        free = self.max_requests - len(self.request_times)
+        owed = sum(max(0, share - used.get(other, 0)) for other in active_keys if other != key)
+        return free <= owed
+
+    def record_success(self, now: float) -> bool:
+        """Grow the budget after a saturated window without 429s. Returns True if the limit changed."""
+        if self.header_limit is not None or now - self._last_adjustment < self.interval:
+            return False
+
+        self._last_adjustment = now
+        self._prune(now)
+        if len(self.request_times) < self.max_requests or self.limit >= self.max_requests_ceiling:
+            return False
+
+        self.limit = min(self.max_requests_ceiling, self.max_requests + 1)
+        _LOGGER.debug("Rate limit window saturated without throttling. Raising budget to %d requests.", self.max_requests)
+        return True
+
+    def record_throttled(self, now: float, retry_after: float = None) -> bool:
+        """Halve the budget after a 429. Returns True if the limit changed."""
+        if retry_after is not None:
+            self._blocked_until = now + retry_after
+
+        self._last_adjustment = now
+        if self._last_decrease is not None and now - self._last_decrease < self.interval:
+            _LOGGER.debug("Throttled again within the same window. Keeping budget at %d requests.", self.max_requests)
+            return False
+
+        self._last_decrease = now
+        previous = self.max_requests
+        self.limit = max(self.min_requests, math.floor(self.max_requests / 2))
+        _LOGGER.warning("Throttled by the API. Lowering budget from %d to %d requests per %d seconds.", previous, self.max_requests, self.interval)
+        return self.max_requests != previous
+
+    def observe_headers(self, headers, now: float) -> bool:
+        """Adopt the limit advertised by rate-limit headers. Returns True if the limit changed."""
+        previous = self.max_requests
+
+        limit = _header_number(headers, LIMIT_HEADERS)
+        if limit is not None and limit >= 1:
+            self.header_limit = int(limit)
+            self.limit = self.header_limit
+        elif self.header_limit is not None:
+            # The API stopped advertising its limit; keep the last one and adapt from there
+            _LOGGER.debug("Rate limit headers no longer sent. Adapting from %d requests.", self.max_requests)
+            self.header_limit = None
+
+        remaining = _header_number(headers, REMAINING_HEADERS)
+        reset = _header_number(headers, RESET_HEADERS)
+        if remaining is not None and remaining <= 0 and reset is not None:
+            # Reset is either seconds until the window resets or an epoch timestamp
+            delay = reset - time.time() if reset > 1e9 else reset
+            self._blocked_until = now + max(0.0, delay)
+
+        return self.max_requests != previous
+
+    def as_dict(self) -> dict:
+        """Return the learned limit in a form suitable for storage."""
+        return {"limit": self.max_requests}
+
+    def restore(self, data: dict):
+        """Restore a previously learned limit."""
+        if not data:
+            return
+        limit = data.get("limit")
+        if isinstance(limit, (int, float)) and limit >= self.min_requests:
+            self.limit = min(int(limit), self.max_requests_ceiling)
+        _LOGGER.debug("Restored rate limit budget of %d requests per %d seconds.", self.max_requests, self.interval)
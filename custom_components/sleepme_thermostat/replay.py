@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from .clock import VirtualClock
+from .command_actor import SleepMeCommandActor
+from .const import API_URL
+from .sleepme import SleepMeClient, round_half_up
+from .transport import ReplayTransport, load_capture, summarize
+from .update_manager import SleepMeUpdateManager
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_INTERVAL = 20
+
+# Command key -> (SleepMeClient method, how the device reports the value back)
+COMMANDS = {
+    "set_temperature_c": ("set_temp_level", round_half_up),
+    "thermal_control_status": ("set_device_status", str),
+}
+
+class ReplayClient(SleepMeClient):
+    """Client that times each request the way the code under test experiences it.
+
+    Timings are in virtual time and cover everything between the call and its
+    result: rate limiter waits, the replayed latency, retries and backoff.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+
+    async def _timed(self, method: str, request):
+        started = self.api.clock()
+        status = "error"
+        try:
+            response = await request
+            status = "ok" if response else "empty"
+            return response
+        finally:
+            self.timings.append({
+                "t": started,
+                "method": method,
+                "endpoint": f"devices/{self.device_id}",
+                "elapsed": self.api.clock() - started,
+                "status": status,
+            })
+
+    async def get_device_status(self, retries: int = 0, wait: bool = False):
+        return await self._timed("GET", super().get_device_status(retries, wait))
+
+    async def set_temp_level(self, temp_c: float, retries: int = 2):
+        return await self._timed("PATCH", super().set_temp_level(temp_c, retries))
+
+    async def set_device_status(self, status: str, retries: int = 2):
+        return await self._timed("PATCH", super().set_device_status(status, retries))
+
+class ReplayUpdateManager(SleepMeUpdateManager):
+    """Update manager whose refreshes run inline instead of through Home Assistant's scheduler."""
+
+    async def async_request_refresh(self):
+        self.data = await self._async_update_data()
+
+def captured_commands(entries, device_id: str) -> list:
+    """Return the ``(at, key, value)`` commands sent to ``device_id`` in a capture.
+
+    Every attempt is captured, so a retry of the value last sent for a key is
+    not scheduled again.
+    """
+    commands = []
+    last_sent = {}
+    for entry in entries:
+        if entry["method"] != "PATCH" or entry["endpoint"] != f"devices/{device_id}":
+            continue
+        for key, value in (entry.get("data") or {}).items():
+            if key in COMMANDS and last_sent.get(key) != value:
+                last_sent[key] = value
+                commands.append((entry["t"], key, value))
+    return commands
+
+async def async_replay(entries, device_id: str, duration: float = 3600, commands=None, speed: float = 1.0) -> dict:
+    """Replay a capture through the update manager and command path, offline.
+
+    Polls run every POLL_INTERVAL seconds for ``duration`` seconds, and each
+    ``(at, key, value)`` in ``commands`` is submitted through the command actor
+    at ``at`` seconds, with its post-command delay, verification and retries.
+    ``commands`` defaults to the commands found in the capture. Everything runs
+    on a VirtualClock, so an hour of traffic replays in moments; ``speed`` is
+    passed to the transport and 0 skips the recorded latency.
+
+    Returns summarize() of the requests as the code under test made them,
+    timed in virtual time, the number of HTTP requests actually served and the
+    outcome of each command, so runs of two versions can be compared.
+    """
+    if commands is None:
+        commands = captured_commands(entries, device_id)
+
+    clock = VirtualClock()
+    transport = ReplayTransport(entries, speed=speed, sleep=clock.sleep)
+    client = ReplayClient(None, API_URL, "", device_id, clock=clock.monotonic, sleep=clock.sleep, client=transport)
+    client.api.device_ids.add(device_id)
+    manager = ReplayUpdateManager(None, client)
+    actor = SleepMeCommandActor(None, manager)
+    results = []
+
+    async def poll():
+        while clock.monotonic() < duration:
+            await manager.async_request_refresh()
+            await clock.sleep(POLL_INTERVAL)
+
+    async def command(at, key, value):
+        method, reported = COMMANDS[key]
+        await clock.sleep(at - clock.monotonic())
+        verified = await actor.submit(
+            key,
+            command_callable=lambda: getattr(client, method)(value),
+            verification_callable=lambda: (manager.data or {}).get("control", {}).get(key) == reported(value),
+            command_description=f"Set {key} to {value}",
+        )
+        results.append({"at": at, "key": key, "value": value, "verified": verified, "finished_at": clock.monotonic()})
+
+    try:
+        await asyncio.gather(poll(), *(command(*spec) for spec in commands))
+    finally:
+        await actor.async_stop()
+
+    summary = summarize(client.timings)
+    summary["http_requests"] = len(transport.served)
+    summary["commands"] = results
+    _LOGGER.debug("Replayed %d requests for device %s.", summary["requests"], device_id)
+    return summary
+
+async def async_replay_file(path: str, device_id: str, **kwargs) -> dict:
+    """Replay a capture file written by the record service, see async_replay()."""
+    entries = await asyncio.get_running_loop().run_in_executor(None, load_capture, path)
+    return await async_replay(entries, device_id, **kwargs)
@@ -1,11 +1,133 @@
 import logging
-from homeassistant.components.sensor import SensorEntity
+from dataclasses import dataclass
+from functools import partial
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, UnitOfTemperature
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .const import DOMAIN
+from .const import DOMAIN, PRESET_TEMPERATURES
+from .entity import SleepMeDescribedEntity, SleepMeEntityDescriptionMixin, describe
 
 _LOGGER = logging.getLogger(__name__)
 
+@dataclass(frozen=True, kw_only=True)
+class SleepMeSensorEntityDescription(SensorEntityDescription, SleepMeEntityDescriptionMixin):
+    """Describes a SleepMe sensor and how to read it from the coordinator data."""
+
+_describe = partial(describe, SleepMeSensorEntityDescription)
+
+def _upper(value):
+    """Uppercase a unit, treating an empty one as unknown."""
+    return value.upper() or None
+
+def _sanitize_set_temperature(value):
+    """Hide the sentinel temperatures used by the Max Cool/Max Heat presets."""
+    return None if value in PRESET_TEMPERATURES.values() else value
+
+SENSOR_DESCRIPTIONS = (
+    _describe(
+        "status", "water_temperature_c",
+        key="water_temperature",
+        name="Water Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+    ),
+    _describe(
+        "control", "set_temperature_c", _sanitize_set_temperature,
+        key="set_temperature",
+        name="Set Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+    ),
+    _describe(
+        "status", "water_level",
+        key="water_level",
+        name="Water Level Percentage",
+        icon="mdi:water-percent",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False,
+    ),
+    _describe(
+        "about", "ip_address",
+        key="ip_address",
+        name="IP Address",
+        icon="mdi:ip",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    _describe(
+        "about", "lan_address",
+        key="lan_address",
+        name="LAN Address",
+        icon="mdi:lan",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    _describe(
+        "control", "brightness_level",
+        key="brightness_level",
+        name="Brightness Level",
+        icon="mdi:brightness-6",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+    ),
+    _describe(
+        "control", "display_temperature_unit", _upper,
+        key="display_temperature_unit",
+        name="Display Temperature Unit",
+        icon="mdi:thermometer",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    _describe(
+        "control", "time_zone",
+        key="time_zone",
+        name="Time Zone",
+        icon="mdi:earth",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    _describe(
+        "about", "firmware_version",
+        key="firmware_version",
+        name="Firmware Version",
+        icon="mdi:chip",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    _describe(
+        "about", "mac_address",
+        key="mac_address",
+        name="MAC Address",
+        icon="mdi:network",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    _describe(
+        "about", "model",
+        key="model",
+        name="Model",
+        icon="mdi:information-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    _describe(
+        "about", "serial_number",
+        key="serial_number",
+        name="Serial Number",
+        icon="mdi:barcode",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up SleepMe Thermostat sensors from a config entry."""
     device_id = entry.data.get("device_id")
@@ -24,119 +146,18 @@ async def async_setup_entry(hass, entry, async_add_entities):
         )
         return
 
-    # Create the sensors and add them
-    ip_address_sensor = IPAddressSensor(coordinator, thermostat, device_id, name)
-    lan_address_sensor = LANAddressSensor(coordinator, thermostat, device_id, name)
-    brightness_level_sensor = BrightnessLevelSensor(coordinator, thermostat, device_id, name)
-    display_temp_unit_sensor = DisplayTemperatureUnitSensor(coordinator, thermostat, device_id, name)
-    time_zone_sensor = TimeZoneSensor(coordinator, thermostat, device_id, name)
-
-    async_add_entities([
-        ip_address_sensor, 
-        lan_address_sensor, 
-        brightness_level_sensor, 
-        display_temp_unit_sensor, 
-        time_zone_sensor
-    ])
-
-class IPAddressSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a sensor that indicates the IP address."""
-
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} IP Address"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_ip_address"
-        self._attr_icon = "mdi:ip"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
-
-    @property
-    def state(self):
-        """Return the IP address of the device."""
-        return self.coordinator.data["about"].get("ip_address")
-
-class LANAddressSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a sensor that indicates the LAN address."""
-
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} LAN Address"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_lan_address"
-        self._attr_icon = "mdi:lan"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
-
-    @property
-    def state(self):
-        """Return the LAN address of the device."""
-        return self.coordinator.data["about"].get("lan_address")
-
-class BrightnessLevelSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a sensor that indicates the brightness level."""
-
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} Brightness Level"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_brightness_level"
-        self._attr_icon = "mdi:brightness-6"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-        self._attr_native_unit_of_measurement = "%"  # Set unit to percentage
-
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
-
-    @property
-    def state(self):
-        """Return the brightness level of the device."""
-        return self.coordinator.data["control"].get("brightness_level")
-
-class DisplayTemperatureUnitSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a sensor that indicates the display temperature unit."""
-
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} Display Temperature Unit"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_display_temperature_unit"
-        self._attr_icon = "mdi:thermometer"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
-
-    @property
-    def state(self):
-        """Return the display temperature unit of the device in uppercase."""
-        temp_unit = self.coordinator.data["control"].get("display_temperature_unit")
-        return temp_unit.upper() if temp_unit else None
-
-class TimeZoneSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a sensor that indicates the time zone."""
+    # One generic entity per described field
+    async_add_entities(
+        SleepMeSensor(coordinator, thermostat, device_id, name, description)
+        for description in SENSOR_DESCRIPTIONS
+    )
 
-    def __init__(self, coordinator, thermostat, device_id, name):
-        super().__init__(coordinator)
-        self._thermostat = thermostat
-        self._device_id = device_id
-        self._attr_name = f"Dock Pro {name} Time Zone"
-        self._attr_unique_id = f"{DOMAIN}_{device_id}_time_zone"
-        self._attr_icon = "mdi:earth"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+class SleepMeSensor(SleepMeDescribedEntity, SensorEntity):
+    """Representation of a SleepMe sensor defined by an entity description."""
 
-        # Reuse the device info from the thermostat entity
-        self._attr_device_info = thermostat.device_info
+    entity_description: SleepMeSensorEntityDescription
 
     @property
-    def state(self):
-        """Return the time zone of the device."""
-        return self.coordinator.data["control"].get("time_zone")
\ No newline at end of file
+    def native_value(self):
+        """Return the value of the described field."""
+        return self._value()
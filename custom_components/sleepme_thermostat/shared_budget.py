@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import uuid
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long a process waits for another one holding the database lock
+LOCK_TIMEOUT = 5
+
+class SQLiteSharedBudget:
+    """Request budget shared by every process that uses the same database file.
+
+    Home Assistant instances and scripts that point at the same local file
+    split one sliding window per token between them: a request is only sent
+    once the window holds fewer than ``limit`` requests from all processes, and
+    a 429 seen by any process blocks the token for all of them. Transactions
+    take SQLite's write lock up front, so concurrent processes cannot both
+    claim the last slot. Times are wall-clock, the only clock processes share.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.owner = uuid.uuid4().hex[:8]
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        if not self._initialized:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS requests (token TEXT NOT NULL, sent REAL NOT NULL, owner TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS requests_token_sent ON requests (token, sent);
+                CREATE TABLE IF NOT EXISTS blocks (token TEXT PRIMARY KEY, until REAL NOT NULL);
+                """
+            )
+            self._initialized = True
+        return connection
+
+    def acquire(self, token: str, limit: int, interval: float) -> float:
+        """Claim a slot for ``token``. Returns 0 if claimed, otherwise the seconds to wait."""
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                wait = self._claim(connection, token, limit, interval, now)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return wait
+        finally:
+            connection.close()
+
+    def _claim(self, connection, token: str, limit: int, interval: float, now: float) -> float:
+        connection.execute("DELETE FROM requests WHERE token = ? AND sent <= ?", (token, now - interval))
+
+        row = connection.execute("SELECT until FROM blocks WHERE token = ?", (token,)).fetchone()
+        if row is not None and row[0] > now:
+            return row[0] - now
+
+        sent = [
+            value for (value,) in connection.execute(
+                "SELECT sent FROM requests WHERE token = ? ORDER BY sent", (token,)
+            )
+        ]
+        if len(sent) >= limit:
+            return max(0.0, sent[len(sent) - limit] + interval - now)
+
+        connection.execute("INSERT INTO requests (token, sent, owner) VALUES (?, ?, ?)", (token, now, self.owner))
+        return 0.0
+
+    def validate(self):
+        """Open the database, creating it if needed. Raises OSError or sqlite3.Error if the path is unusable."""
+        self._connect().close()
+
+    def block(self, token: str, seconds: float):
+        """Stop every process from using ``token`` for ``seconds``, e.g. after a 429."""
+        until = time.time() + seconds
+        connection = self._connect()
+        try:
+            connection.execute(
+                "INSERT INTO blocks (token, until) VALUES (?, ?) "
+                "ON CONFLICT(token) DO UPDATE SET until = MAX(until, excluded.until)",
+                (token, until),
+            )
+        finally:
+            connection.close()
+
+    async def async_acquire(self, token: str, limit: int, interval: float) -> float:
+        """Run acquire() in the executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.acquire, token, limit, interval)
+
+    async def async_block(self, token: str, seconds: float):
+        """Run block() in the executor."""
+        await asyncio.get_running_loop().run_in_executor(None, self.block, token, seconds)
@@ -1,4 +1,5 @@
 import logging
+from .cache import ABOUT_FIELD_GROUPS, CLAIMED_DEVICES_TTL, TTLCache
 from .sleepme_api import SleepMeAPI
 from homeassistant.core import HomeAssistant
 
@@ -9,11 +10,14 @@ def round_half_up(n):
     return round(n * 2) / 2
 
 class SleepMeClient:
-    def __init__(self, hass: HomeAssistant, api_url: str, token: str, device_id: str = None):
+    def __init__(self, hass: HomeAssistant, api_url: str, token: str, device_id: str = None, clock=None, sleep=None, api: SleepMeAPI = None, cache: TTLCache = None, client=None):
         self.api_url = api_url
         self.token = token
         self.device_id = device_id
-        self.api = SleepMeAPI(hass, api_url, token)
+        # Clients of the same account share one SleepMeAPI and therefore one request budget
+        self.api = api or SleepMeAPI(hass, api_url, token, clock=clock, sleep=sleep, client=client)
+        # ...and one cache for slow-changing metadata and device listings
+        self.cache = cache or TTLCache(self.api.clock)
         _LOGGER.debug(f"[Device {self.device_id}] Initialized SleepMeClient with API URL: {self.api_url}")
 
     async def set_temp_level(self, temp_c: float, retries: int = 2):
@@ -23,7 +27,7 @@ class SleepMeClient:
         data = {"set_temperature_c": temp_c}
         _LOGGER.debug(f"[Device {self.device_id}] Sending request to set temperature to {temp_c}C")
 
-        response = await self.api.api_request("PATCH", endpoint, data=data, retries=retries)
+        response = await self.api.api_request("PATCH", endpoint, data=data, retries=retries, device_id=self.device_id)
 
         if not response:
             _LOGGER.warning(f"Failed to set temperature to {temp_c}C for device {self.device_id}. Received empty response.")
@@ -43,7 +47,7 @@ class SleepMeClient:
         data = {"thermal_control_status": status}
         _LOGGER.debug(f"[Device {self.device_id}] Sending request to set device status to {status}")
 
-        response = await self.api.api_request("PATCH", endpoint, data=data, retries=retries)
+        response = await self.api.api_request("PATCH", endpoint, data=data, retries=retries, device_id=self.device_id)
 
         if not response:
             _LOGGER.warning(f"Failed to set device status to {status} for device {self.device_id}. Received empty response.")
@@ -54,30 +58,64 @@ class SleepMeClient:
 
         return response
 
-    async def get_claimed_devices(self, retries: int = 1):
-        """Return a list of claimed devices for the given token, with retry logic."""
+    async def get_claimed_devices(self, retries: int = 1, wait: bool = False):
+        """Return a list of claimed devices for the given token, with retry logic.
+
+        With ``wait`` the request waits for the rate limit instead of being discarded.
+        """
+        cached = self.cache.get("claimed_devices")
+        if cached is not None:
+            _LOGGER.debug(f"[Device {self.device_id}] Using cached claimed devices.")
+            return cached
+
         endpoint = "devices"
         _LOGGER.debug(f"[Device {self.device_id}] Fetching claimed devices from {endpoint}")
-        
-        response = await self.api.api_request("GET", endpoint, retries=retries)
+
+        response = await self.api.api_request("GET", endpoint, retries=retries, device_id=self.device_id, wait=wait)
 
         if isinstance(response, list):
             _LOGGER.info(f"Successfully fetched claimed devices: {response}")
+            if response:
+                self.cache.set("claimed_devices", response, CLAIMED_DEVICES_TTL)
             return response
 
         _LOGGER.error(f"Unexpected response format for claimed devices: {response}")
         return []
 
-    async def get_device_status(self, retries: int = 0):
+    async def get_device_status(self, retries: int = 0, wait: bool = False):
         """Retrieve the device status, with retry logic."""
         endpoint = f"devices/{self.device_id}"
-        _LOGGER.debug(f"[Device {self.device_id}] Fetching device status from {endpoint}")
-        
-        response = await self.api.api_request("GET", endpoint, retries=retries)
-        
+        _LOGGER.debug("[Device %s] Fetching device status from %s", self.device_id, endpoint)
+
+        response = await self.api.api_request("GET", endpoint, retries=retries, device_id=self.device_id, wait=wait)
+
         if isinstance(response, dict):
-            _LOGGER.debug(f"[Device {self.device_id}] Device status: {response}")
+            _LOGGER.debug("[Device %s] Device status: %s", self.device_id, response)
             return response
-        
-        _LOGGER.error(f"Failed to fetch device status for {self.device_id}. Response: {response}")
-        return {}
\ No newline at end of file
+
+        _LOGGER.error("Failed to fetch device status for %s. Response: %s", self.device_id, response)
+        return {}
+
+    def remember_about(self, about: dict) -> dict:
+        """Store the field groups of a freshly polled ``about`` block and return it unchanged.
+
+        Polled values are always current and cost nothing extra, so they are
+        used as-is; caching them only lets get_device_about() skip a request
+        while a group's TTL has not expired.
+        """
+        for group, (fields, ttl) in ABOUT_FIELD_GROUPS.items():
+            values = {field: about.get(field) for field in fields}
+            if any(value is not None for value in values.values()):
+                self.cache.set((self.device_id, group), values, ttl)
+        return about
+
+    async def get_device_about(self, wait: bool = False) -> dict:
+        """Return the device's metadata, fetching the device status only if a cached group expired."""
+        cached = {}
+        for group in ABOUT_FIELD_GROUPS:
+            values = self.cache.get((self.device_id, group))
+            if values is None:
+                device_status = await self.get_device_status(wait=wait)
+                return self.remember_about(device_status.get("about", {}))
+            cached.update(values)
+        return cached
\ No newline at end of file
@@ -1,67 +1,203 @@
 import asyncio
+import hashlib
 import httpx
 import logging
+import sqlite3
 import time
+import uuid
 from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.helpers.storage import Store
 from homeassistant.core import HomeAssistant
-from collections import deque
+from .const import DOMAIN
+from .rate_limit import AdaptiveRateLimiter, parse_retry_after
+from .tracing import COMMAND_SAMPLE_RATE, POLL_SAMPLE_RATE, tracer
+from .transport import RequestRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
+def token_key(token: str) -> str:
+    """Return a short, non-reversible identifier for an API token."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16] if token else "anonymous"
+
 class SleepMeAPI:
-    def __init__(self, hass: HomeAssistant, api_url: str, token: str, max_requests_per_minute=9):
+    def __init__(self, hass: HomeAssistant, api_url: str, token: str, max_requests_per_minute=9, clock=None, sleep=None, client=None):
         self.api_url = api_url
         self.token = token
-        self.client = get_async_client(hass)
-        self.request_times = deque(maxlen=max_requests_per_minute)
+        # Any object with httpx.AsyncClient's request(), e.g. a ReplayTransport for offline runs
+        self.client = client or get_async_client(hass)
         self.rate_limit_interval = 60  # seconds
 
-    async def api_request(self, method: str, endpoint: str, params=None, data=None, input_headers=None, retries=3):
-        """Handles rate limiting, retries, and calls perform_request."""
-        request_id = f"{method.upper()}-{endpoint}-{int(time.time())}"
-        _LOGGER.debug(f"[{request_id}] Starting API request with {retries} retries remaining.")
-
-        async with asyncio.Lock():
-            current_time = time.time()
-
-            # Rate limiting logic
-            if len(self.request_times) == self.request_times.maxlen and current_time - self.request_times[0] < self.rate_limit_interval:
-                wait_time = self.rate_limit_interval - (current_time - self.request_times[0])
-
-                if method.upper() == "GET":
-                    _LOGGER.warning(f"[{request_id}] Rate limiting active. Discarding GET request to {endpoint} instead of delaying by {wait_time:.2f} seconds.")
+        # Monotonic clock and sleeper driving the rate limiter and backoff; a
+        # VirtualClock can be injected to run them without real waits.
+        self.clock = clock or time.monotonic
+        self.sleep = sleep or asyncio.sleep
+        self._rate_limit_lock = asyncio.Lock()
+
+        # The request budget adapts to headers and 429s, and the learned limit is persisted per token
+        # unless there is no Home Assistant instance, e.g. when replaying a capture offline
+        self.rate_limiter = AdaptiveRateLimiter(max_requests_per_minute, self.rate_limit_interval, clock=self.clock)
+        self._rate_limit_store = Store(hass, 1, f"{DOMAIN}.rate_limit.{token_key(token)}") if hass is not None else None
+
+        # Devices sharing this client; polls are split fairly between them
+        self.device_ids = set()
+
+        # Cumulative seconds spent per phase and request counters, read by the profile service
+        self.stats = {"rate_limit_wait": 0.0, "network": 0.0, "backoff": 0.0, "requests": 0, "discarded": 0}
+
+        # Set to a RequestRecorder to capture every request attempt
+        self.recorder = None
+
+        # Optional budget shared with other processes using the same token
+        self.shared_budget = None
+        self._token_key = token_key(token)
+
+    def start_recording(self) -> RequestRecorder:
+        """Start capturing requests and responses."""
+        self.recorder = RequestRecorder(self.token, self.clock())
+        return self.recorder
+
+    def stop_recording(self) -> RequestRecorder:
+        """Stop capturing and return the recorder holding the capture."""
+        recorder, self.recorder = self.recorder, None
+        return recorder
+
+    async def async_load_rate_limit(self):
+        """Restore the rate limit budget learned for this token."""
+        if self._rate_limit_store is None:
+            return
+        self.rate_limiter.restore(await self._rate_limit_store.async_load())
+
+    def _save_rate_limit(self):
+        """Schedule persisting the learned rate limit budget."""
+        if self._rate_limit_store is None:
+            return
+        self._rate_limit_store.async_delay_save(self.rate_limiter.as_dict, 10)
+
+    async def api_request(self, method: str, endpoint: str, params=None, data=None, input_headers=None, retries=3, device_id=None, request_id=None, wait=False):
+        """Handles rate limiting, retries, and calls perform_request.
+
+        Rate-limited GET requests are discarded unless ``wait`` is set, in which
+        case they wait for a slot like commands do.
+        """
+        method = method.upper()
+        sample_rate = POLL_SAMPLE_RATE if method == "GET" else COMMAND_SAMPLE_RATE
+        with tracer.start_trace("api_request", sample_rate, method=method, endpoint=endpoint, retries=retries) as span:
+            # The request id is kept across retries so one request can be followed through the logs
+            if request_id is None:
+                request_id = f"{method}-{endpoint}-{span.trace_id or uuid.uuid4().hex[:8]}"
+            span.set(request_id=request_id)
+            return await self._api_request(method, endpoint, params, data, input_headers, retries, device_id, request_id, wait)
+
+    async def _api_request(self, method: str, endpoint: str, params, data, input_headers, retries, device_id, request_id, wait):
+        _LOGGER.debug("[%s] Starting API request with %s retries remaining.", request_id, retries)
+
+        with tracer.span("rate_limit_wait") as wait_span:
+            wait_start = self.clock()
+            while True:
+                # The lock only guards checking and claiming a slot; waiting happens outside it so
+                # a command sitting out a block never holds up the polls that would be discarded anyway
+                async with self._rate_limit_lock:
+                    current_time = self.clock()
+
+                    # Rate limiting logic
+                    wait_time = self.rate_limiter.wait_time(current_time)
+                    reason = "rate_limited"
+                    if wait_time <= 0 and method == "GET" and not wait and self.rate_limiter.exceeds_fair_share(device_id, current_time, self.device_ids):
+                        _LOGGER.debug("[%s] Device %s used its share of the rate limit. Discarding GET request to %s.", request_id, device_id, endpoint)
+                        self.stats["discarded"] += 1
+                        wait_span.set(discarded="fair_share")
+                        return {}
+
+                    if wait_time <= 0 and self.shared_budget is not None:
+                        wait_time = await self._acquire_shared_slot()
+                        reason = "shared_budget"
+                        current_time = self.clock()
+
+                    if wait_time <= 0:
+                        # Count the request against the current window
+                        self.rate_limiter.record_request(current_time, device_id)
+                        break
+
+                if method == "GET" and not wait:
+                    if reason == "shared_budget":
+                        _LOGGER.debug("[%s] Shared rate budget exhausted. Discarding GET request to %s instead of delaying by %.2f seconds.", request_id, endpoint, wait_time)
+                    else:
+                        _LOGGER.warning("[%s] Rate limiting active. Discarding GET request to %s instead of delaying by %.2f seconds.", request_id, endpoint, wait_time)
+                    self.stats["discarded"] += 1
+                    wait_span.set(discarded=reason)
                     return {}  # Discard the GET request and return an empty dictionary
 
-                _LOGGER.debug(f"[{request_id}] Rate limiting: waiting for {wait_time:.2f} seconds before making {method.upper()} request to {endpoint}.")
-                await asyncio.sleep(wait_time)
-
-            # Add the current time to the deque
-            self.request_times.append(current_time)
+                _LOGGER.debug("[%s] Rate limiting (%s): waiting for %.2f seconds before making %s request to %s.", request_id, reason, wait_time, method, endpoint)
+                await self.sleep(wait_time)
+            self.stats["rate_limit_wait"] += current_time - wait_start
 
         # Perform the API request
         try:
-            result = await self.perform_request(method, endpoint, params=params, data=data, input_headers=input_headers)
-            _LOGGER.debug(f"[{request_id}] API request successful.")
+            result = await self.perform_request(method, endpoint, params=params, data=data, input_headers=input_headers, request_id=request_id)
+            _LOGGER.debug("[%s] API request successful.", request_id)
             return result
         except Exception as e:
-            _LOGGER.debug(f"[{request_id}] Exception occurred: {e}. Passing to handle_error.")
-            return await self.handle_error(e, method, endpoint, params, data, input_headers, retries)
+            _LOGGER.debug("[%s] Exception occurred: %s. Passing to handle_error.", request_id, e)
+            return await self.handle_error(e, method, endpoint, params, data, input_headers, retries, device_id, request_id, wait)
 
-    async def perform_request(self, method: str, endpoint: str, params=None, data=None, input_headers=None):
+    async def perform_request(self, method: str, endpoint: str, params=None, data=None, input_headers=None, request_id=None):
         """Executes the actual API request."""
-        request_id = f"{method.upper()}-{endpoint}-{int(time.time())}"
+        method = method.upper()
+        request_id = request_id or f"{method}-{endpoint}-{uuid.uuid4().hex[:8]}"
         headers = input_headers or {}
         headers["Authorization"] = f"Bearer {self.token}"
 
-        _LOGGER.debug(f"[{request_id}] Making {method.upper()} request to {self.api_url}/{endpoint} with params: {params} and data: {data}")
-        response = await self.client.request(method, f"{self.api_url}/{endpoint}", headers=headers, json=data, params=params)
+        _LOGGER.debug("[%s] Making %s request to %s/%s with params: %s and data: %s", request_id, method, self.api_url, endpoint, params, data)
+        with tracer.span("http", method=method, endpoint=endpoint) as http_span:
+            request_start = self.clock()
+            try:
+                response = await self.client.request(method, f"{self.api_url}/{endpoint}", headers=headers, json=data, params=params)
+            except httpx.RequestError as err:
+                if self.recorder is not None:
+                    self.recorder.record(request_start, method, endpoint, params, data, self.clock() - request_start, error=err)
+                raise
+            finally:
+                self.stats["network"] += self.clock() - request_start
+                self.stats["requests"] += 1
+            http_span.set(status=response.status_code)
+        if self.recorder is not None:
+            self.recorder.record(request_start, method, endpoint, params, data, self.clock() - request_start, response=response)
+        self._observe_rate_limit(response)
+        if response.status_code == 429 and self.shared_budget is not None:
+            await self._block_shared(parse_retry_after(response.headers) or self.rate_limit_interval)
         response.raise_for_status()
-        _LOGGER.debug(f"[{request_id}] Request to {endpoint} completed successfully with status {response.status_code}.")
+        _LOGGER.debug("[%s] Request to %s completed successfully with status %s.", request_id, endpoint, response.status_code)
         return response.json()  # Process and return the JSON response
 
-    async def handle_error(self, error, method: str, endpoint: str, params=None, data=None, input_headers=None, retries=3):
+    async def _acquire_shared_slot(self) -> float:
+        """Claim a slot in the shared budget, falling back to the local limiter if it is unavailable."""
+        try:
+            return await self.shared_budget.async_acquire(self._token_key, self.rate_limiter.max_requests, self.rate_limit_interval)
+        except (sqlite3.Error, OSError) as err:
+            _LOGGER.warning("Shared rate budget unavailable, using the local limit only: %s", err)
+            return 0.0
+
+    async def _block_shared(self, seconds: float):
+        """Tell the other processes sharing this token to back off."""
+        try:
+            await self.shared_budget.async_block(self._token_key, seconds)
+        except (sqlite3.Error, OSError) as err:
+            _LOGGER.warning("Could not record throttling in the shared rate budget: %s", err)
+
+    def _observe_rate_limit(self, response):
+        """Feed rate-limit headers and throttling responses into the adaptive limiter."""
+        now = self.clock()
+        changed = self.rate_limiter.observe_headers(response.headers, now)
+        if response.status_code == 429:
+            changed = self.rate_limiter.record_throttled(now, parse_retry_after(response.headers)) or changed
+        elif response.status_code < 400:
+            changed = self.rate_limiter.record_success(now) or changed
+        if changed:
+            self._save_rate_limit()
+
+    async def handle_error(self, error, method: str, endpoint: str, params=None, data=None, input_headers=None, retries=3, device_id=None, request_id=None, wait=False):
         """Classifies errors and applies backoff before retrying if necessary."""
-        request_id = f"{method.upper()}-{endpoint}-{int(time.time())}"
+        request_id = request_id or f"{method.upper()}-{endpoint}-{uuid.uuid4().hex[:8]}"
 
         if retries <= 0:
             _LOGGER.debug(f"[{request_id}] API request to {endpoint} failed after all retries.")
@@ -94,12 +230,20 @@ class SleepMeAPI:
             raise ValueError("cannot_connect")
 
         backoff_time = initial_backoff * (2 ** (retries - 1))
+        if isinstance(error, httpx.HTTPStatusError):
+            # Never retry earlier than the server asked us to
+            retry_after = parse_retry_after(error.response.headers)
+            if retry_after is not None:
+                backoff_time = max(backoff_time, retry_after)
         _LOGGER.warning(f"[{request_id}] Retrying after {backoff_time} seconds. Retries left: {retries-1}")
 
-        await asyncio.sleep(backoff_time)
+        with tracer.span("backoff", seconds=backoff_time):
+            backoff_start = self.clock()
+            await self.sleep(backoff_time)
+            self.stats["backoff"] += self.clock() - backoff_start
 
         # Retry the API request with one less retry
-        return await self.api_request(method, endpoint, params=params, data=data, input_headers=input_headers, retries=retries-1)
+        return await self.api_request(method, endpoint, params=params, data=data, input_headers=input_headers, retries=retries-1, device_id=device_id, request_id=request_id, wait=wait)
 
     async def close(self):
         """Close the httpx client."""
@@ -0,0 +1,183 @@
+import json
+import logging
+from contextlib import contextmanager
+import random
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMAND_SAMPLE_RATE = 1.0
+POLL_SAMPLE_RATE = 0.05
+MAX_TRACES = 200
+
+_current_span = ContextVar("sleepme_current_span", default=None)
+
+def _active_span():
+    """Return the current span, ignoring one left behind by a trace that has already finished."""
+    span = _current_span.get()
+    if span is None or span.trace.finished:
+        return None
+    return span
+
+class _NoopSpan:
+    """Stand-in used when the current trace is not sampled."""
+
+    trace_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """A timed phase of a trace, nested under the span that was current when it started."""
+
+    __slots__ = ("trace", "span_id", "parent", "name", "attributes", "start", "end", "_token")
+
+    def __init__(self, trace, name, parent, attributes):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent = parent
+        self.name = name
+        self.attributes = attributes
+        self.start = None
+        self.end = None
+        self._token = None
+        trace.spans.append(self)
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, **attributes):
+        """Attach attributes, e.g. a status code, once they are known."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start = self.trace.tracer.clock()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = self.trace.tracer.clock()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+        if self.parent is None:
+            self.trace.tracer._finish(self.trace)
+        return False
+
+    def as_dict(self) -> dict:
+        root_start = self.trace.spans[0].start
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "offset_ms": round((self.start - root_start) * 1000, 2),
+            "duration_ms": round(((self.end or self.start) - self.start) * 1000, 2),
+            "attributes": self.attributes,
+        }
+
+class Trace:
+    """All spans recorded for one user command or poll."""
+
+    def __init__(self, tracer, started_at: float):
+        self.tracer = tracer
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started_at = started_at
+        self.spans = []
+        # Set once the root span exits; later spans must not join the trace
+        self.finished = False
+
+    def as_dict(self) -> dict:
+        root = self.spans[0]
+        phases = {}
+        for span in self.spans[1:]:
+            if span.end is not None:
+                phases[span.name] = round(phases.get(span.name, 0.0) + (span.end - span.start) * 1000, 2)
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "duration_ms": root.as_dict()["duration_ms"],
+            "phases_ms": phases,
+            "spans": [span.as_dict() for span in self.spans],
+        }
+
+class Tracer:
+    """Samples traces and keeps the most recent finished ones for export.
+
+    Spans follow the current task through contextvars, so a trace started by
+    a climate service call is continued by the command actor, the rate limiter,
+    every HTTP attempt and retry, and the verification refresh. Unsampled
+    traces cost a context variable lookup per span.
+    """
+
+    def __init__(self, max_traces: int = MAX_TRACES, clock=time.perf_counter):
+        self.clock = clock
+        self.traces = deque(maxlen=max_traces)
+
+    def start_trace(self, name: str, sample_rate: float = COMMAND_SAMPLE_RATE, **attributes):
+        """Start a root span, or continue the current trace if one is active."""
+        if _active_span() is not None:
+            return self.span(name, **attributes)
+        if random.random() >= sample_rate:
+            return _NOOP_SPAN
+        return Span(Trace(self, time.time()), name, None, attributes)
+
+    def span(self, name: str, **attributes):
+        """Start a child span of the current span; a no-op when not tracing."""
+        parent = _active_span()
+        if parent is None:
+            return _NOOP_SPAN
+        return Span(parent.trace, name, parent, attributes)
+
+    @contextmanager
+    def attach(self, span):
+        """Make ``span`` current for the block; a no-op when it is not a live span."""
+        if not isinstance(span, Span) or span.trace.finished:
+            yield
+            return
+        token = _current_span.set(span)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+    def current_trace_id(self):
+        """Return the id of the active trace, or None."""
+        span = _active_span()
+        return span.trace_id if span is not None else None
+
+    def _finish(self, trace: Trace):
+        trace.finished = True
+        self.traces.append(trace)
+
+    def export(self) -> list:
+        """Return the finished traces, oldest first, as JSON-serializable dicts."""
+        return [trace.as_dict() for trace in self.traces]
+
+tracer = Tracer()
+
+async def async_export_traces(hass) -> str:
+    """Write the finished traces to a JSON file in the config directory."""
+    content = json.dumps(tracer.export(), indent=2, default=str)
+    path = hass.config.path(f"sleepme_traces_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    def _write():
+        with open(path, "w", encoding="utf-8") as traces_file:
+            traces_file.write(content)
+
+    await hass.async_add_executor_job(_write)
+    _LOGGER.info("SleepMe Thermostat traces written to %s", path)
+    return path
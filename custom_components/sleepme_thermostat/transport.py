@@ -0,0 +1,190 @@
+import asyncio
+import gzip
+import json
+import logging
+import statistics
+from collections import defaultdict, deque
+from datetime import datetime
+import httpx
+from .const import API_URL
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "**REDACTED**"
+
+# Response headers worth keeping: the ones that drive rate limiting and retries
+RECORDED_HEADERS = (
+    "content-type",
+    "retry-after",
+    "x-ratelimit-limit",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+    "ratelimit-limit",
+    "ratelimit-remaining",
+    "ratelimit-reset",
+)
+
+class ReplayExhaustedError(httpx.RequestError):
+    """Raised when a replayed capture has no response left for a request."""
+
+class RecordingBusyError(RuntimeError):
+    """Raised when a recording is already in progress."""
+
+class RequestRecorder:
+    """Captures request/response sequences seen by a SleepMeAPI.
+
+    Each entry keeps the request line, payload, status, rate-limit headers,
+    response body and latency, timed relative to the start of the recording.
+    The API token is never written: the Authorization header is not recorded
+    and any occurrence of the token elsewhere is replaced.
+    """
+
+    def __init__(self, token: str, started: float):
+        self.token = token
+        self.started = started
+        self.entries = []
+
+    def record(self, at: float, method: str, endpoint: str, params, data, elapsed: float, response=None, error=None):
+        """Add one request attempt to the capture."""
+        entry = {
+            "t": round(at - self.started, 3),
+            "method": method,
+            "endpoint": endpoint,
+            "params": params,
+            "data": data,
+            "elapsed": round(elapsed, 4),
+        }
+        if response is not None:
+            entry["status"] = response.status_code
+            entry["headers"] = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+            entry["body"] = response.text
+        else:
+            entry["error"] = "timeout" if isinstance(error, httpx.TimeoutException) else "connect"
+        self.entries.append(entry)
+
+    def dumps(self) -> bytes:
+        """Return the capture as gzip-compressed JSON lines with the token redacted."""
+        lines = []
+        for entry in self.entries:
+            line = json.dumps(entry, separators=(",", ":"))
+            if self.token:
+                line = line.replace(self.token, REDACTED)
+            lines.append(line)
+        return gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+
+def load_capture(path: str) -> list:
+    """Read a capture written by RequestRecorder."""
+    with gzip.open(path, "rt", encoding="utf-8") as capture_file:
+        return [json.loads(line) for line in capture_file if line.strip()]
+
+def summarize(entries) -> dict:
+    """Return request counts and latency figures for a capture or a replay run."""
+    latencies = [entry["elapsed"] for entry in entries]
+    by_endpoint = defaultdict(int)
+    by_status = defaultdict(int)
+    for entry in entries:
+        by_endpoint[f"{entry['method']} {entry['endpoint']}"] += 1
+        by_status[str(entry.get("status", entry.get("error")))] += 1
+
+    summary = {
+        "requests": len(entries),
+        "by_endpoint": dict(by_endpoint),
+        "by_status": dict(by_status),
+    }
+    if latencies:
+        summary["latency_mean"] = statistics.fmean(latencies)
+        summary["latency_max"] = max(latencies)
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=20, method="inclusive")
+            summary["latency_p50"] = cuts[9]
+            summary["latency_p95"] = cuts[18]
+    return summary
+
+class ReplayTransport:
+    """Serves a recorded capture back in place of the httpx client.
+
+    Pass an instance as ``client`` to SleepMeAPI. Requests are answered in the
+    order they were captured for each method and endpoint, after the recorded
+    latency divided by ``speed``. With ``loop=True`` each endpoint's sequence
+    starts over when exhausted, otherwise ReplayExhaustedError is raised.
+    """
+
+    def __init__(self, entries, speed: float = 1.0, sleep=None, loop: bool = False, api_url: str = API_URL):
+        self.api_url = api_url
+        self.speed = speed
+        self.sleep = sleep or asyncio.sleep
+        self.loop = loop
+        self._entries = defaultdict(list)
+        for entry in entries:
+            self._entries[(entry["method"], entry["endpoint"])].append(entry)
+        self._queues = {key: deque(values) for key, values in self._entries.items()}
+        self.served = []
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs):
+        """Build a replay transport from a capture file."""
+        return cls(load_capture(path), **kwargs)
+
+    def _next_entry(self, method: str, endpoint: str):
+        key = (method, endpoint)
+        queue = self._queues.get(key)
+        if not queue and self.loop and self._entries.get(key):
+            queue = self._queues[key] = deque(self._entries[key])
+        if not queue:
+            raise ReplayExhaustedError(f"No recorded response left for {method} {endpoint}")
+        return queue.popleft()
+
+    async def request(self, method: str, url: str, headers=None, json=None, params=None):
+        """Answer a request the way httpx.AsyncClient.request would."""
+        method = method.upper()
+        endpoint = url[len(self.api_url) + 1:] if url.startswith(f"{self.api_url}/") else url
+        entry = self._next_entry(method, endpoint)
+
+        if self.speed > 0:
+            await self.sleep(entry["elapsed"] / self.speed)
+        self.served.append(entry)
+
+        request = httpx.Request(method, url, params=params)
+        if "error" in entry:
+            if entry["error"] == "timeout":
+                raise httpx.ReadTimeout("Replayed timeout", request=request)
+            raise httpx.ConnectError("Replayed connection error", request=request)
+
+        return httpx.Response(
+            entry["status"],
+            headers=entry.get("headers", {}),
+            content=entry.get("body", "").encode("utf-8"),
+            request=request,
+        )
+
+    async def aclose(self):
+        """Nothing to close; present for parity with httpx.AsyncClient."""
+
+async def async_record(hass, apis, seconds: float) -> list:
+    """Record every account's traffic for ``seconds`` and write one capture per account to the config directory."""
+    if any(api.recorder is not None for api in apis.values()):
+        raise RecordingBusyError("A recording is already in progress.")
+
+    for api in apis.values():
+        api.start_recording()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        recorders = {name: api.stop_recording() for name, api in apis.items()}
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    captures = {
+        hass.config.path(f"sleepme_capture_{name}_{timestamp}.jsonl.gz"): recorder.dumps()
+        for name, recorder in recorders.items()
+        if recorder is not None
+    }
+
+    def _write():
+        for path, content in captures.items():
+            with open(path, "wb") as capture_file:
+                capture_file.write(content)
+
+    await hass.async_add_executor_job(_write)
+    for path in captures:
+        _LOGGER.info("SleepMe Thermostat capture written to %s", path)
+    return list(captures)
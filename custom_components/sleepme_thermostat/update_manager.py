@@ -1,21 +1,45 @@
+import asyncio
+import contextvars
 import logging
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
 from datetime import timedelta
+from .const import DOMAIN
 from .sleepme import SleepMeClient
+from .tracing import tracer
 
 _LOGGER = logging.getLogger(__name__)
 
+def changed_fields(previous, current) -> frozenset:
+    """Return the (section, key) pairs whose values differ between two payloads."""
+    changed = set()
+    for section, values in current.items():
+        old_values = (previous or {}).get(section, {})
+        for key in values.keys() | old_values.keys():
+            if values.get(key) != old_values.get(key):
+                changed.add((section, key))
+    return frozenset(changed)
+
 class SleepMeUpdateManager(DataUpdateCoordinator):
     """Manages data updates for SleepMe devices."""
 
-    def __init__(self, hass: HomeAssistant, api_url: str, token: str, device_id: str):
-        self.client = SleepMeClient(hass, api_url, token, device_id)
+    def __init__(self, hass: HomeAssistant, client: SleepMeClient, entry: ConfigEntry = None):
+        self.client = client
+        self._entry = entry
+        device_id = client.device_id
         self.device_id = device_id
 
         # Initialize the last known good status as None
         self._last_valid_status = None
 
+        # Fields that changed in the latest update, used by entities to skip unchanged polls
+        self.changed_fields = frozenset()
+
+        # Span a requested refresh should report to, see async_request_traced_refresh
+        self._trace_parent = None
+
         # Set the update interval to 20 seconds
         update_interval = timedelta(seconds=20)
 
@@ -30,10 +54,12 @@ class SleepMeUpdateManager(DataUpdateCoordinator):
         """Fetch the latest data from the SleepMe API."""
         try:
             # Fetch device status from the API
-            device_status = await self.client.get_device_status()
+            with tracer.attach(self._trace_parent):
+                device_status = await self.client.get_device_status()
 
             # If the device status is empty, return the last valid status
             if not device_status:
+                self.changed_fields = frozenset()
                 _LOGGER.warning(f"Using last valid status for device {self.device_id} due to empty or failed update.")
                 return self._last_valid_status or {
                     "status": {},
@@ -42,19 +68,52 @@ class SleepMeUpdateManager(DataUpdateCoordinator):
                 }
 
             # Cache the current valid status
-            self._last_valid_status = {
+            current_status = {
                 "status": device_status.get("status", {}),
                 "control": device_status.get("control", {}),
-                "about": device_status.get("about", {}),
+                # Polled metadata also refreshes the cache used when it has to be fetched on its own
+                "about": self.client.remember_about(device_status.get("about", {})),
             }
+            self._update_device_registry(current_status["about"])
+            self.changed_fields = changed_fields(self._last_valid_status, current_status)
+            self._last_valid_status = current_status
 
             return self._last_valid_status
 
         except Exception as e:
             _LOGGER.error(f"Error updating device data for {self.device_id}: {e}")
+            self.changed_fields = frozenset()
             # If an error occurs, return the last valid status
             return self._last_valid_status or {
                 "status": {},
                 "control": {},
                 "about": {},
             }
+
+    async def async_request_traced_refresh(self, span):
+        """Request a refresh whose API calls join ``span``'s trace.
+
+        The refresh runs in an empty context: the coordinator schedules the
+        next poll from inside it, and that poll must not inherit the caller's
+        span. The span is handed over explicitly for this refresh only.
+        """
+        self._trace_parent = span
+        try:
+            await asyncio.create_task(self.async_request_refresh(), context=contextvars.Context())
+        finally:
+            self._trace_parent = None
+
+    def _update_device_registry(self, about: dict):
+        """Keep the device registry and config entry in step with the device's firmware."""
+        firmware_version = about.get("firmware_version")
+        if self._entry is None or not firmware_version or firmware_version == self._entry.data.get("firmware_version"):
+            return
+
+        _LOGGER.info(f"[Device {self.device_id}] Firmware changed from {self._entry.data.get('firmware_version')} to {firmware_version}.")
+        self.hass.config_entries.async_update_entry(
+            self._entry, data={**self._entry.data, "firmware_version": firmware_version}
+        )
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(identifiers={(DOMAIN, self.device_id)})
+        if device is not None:
+            device_registry.async_update_device(device.id, sw_version=firmware_version)